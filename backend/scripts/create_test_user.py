@@ -38,7 +38,6 @@ def create_test_user(username: str = "testuser", password: str = "testpass123"):
         )
         db.add(user)
         db.commit()
-        db.refresh(user)
 
         print(f"Created test user: {username} (id={user.id})")
         return user
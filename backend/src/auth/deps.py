@@ -1,80 +1,84 @@
 """Auth dependencies for FastAPI routes."""
 from typing import Optional
+
+from cachetools import TTLCache
 from fastapi import Cookie, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from ..database import get_db, User
 from .utils import decode_token
 
+# Short-lived cache of detached User objects keyed by user_id, so the hot
+# auth path skips the per-request SELECT. Invalidated on logout.
+_USER_CACHE: TTLCache = TTLCache(maxsize=5000, ttl=60)
 
-def _validate_token_and_get_user(
-    token: Optional[str],
-    db: Session,
-    raise_on_error: bool = True
-) -> Optional[User]:
-    """
-    Validate JWT token and return the user.
 
-    Args:
-        token: JWT token from cookie
-        db: Database session
-        raise_on_error: If True, raise HTTPException on validation failure.
-                       If False, return None on failure.
+def invalidate_user_cache(user_id: int) -> None:
+    """Drop a cached user snapshot (e.g. on logout)."""
+    _USER_CACHE.pop(user_id, None)
 
-    Returns:
-        User if valid, None if invalid and raise_on_error is False
 
-    Raises:
-        HTTPException if validation fails and raise_on_error is True
+def _resolve_user(token: Optional[str], db: Session) -> tuple[Optional[User], str]:
+    """Resolve the authenticated user from a JWT cookie.
+
+    Returns:
+        (user, "") on success, (None, reason) on any failure — straight-line
+        code with no error-mode flag, since this runs on every request.
     """
     if not token:
-        if raise_on_error:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Ikke logget ind"
-            )
-        return None
+        return None, "Ikke logget ind"
 
     payload = decode_token(token)
     if not payload:
-        if raise_on_error:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Ugyldig eller udløbet session"
-            )
-        return None
-
-    # Check if 'sub' exists in payload before database lookup
-    sub = payload.get("sub")
-    if sub is None or sub == "":
-        if raise_on_error:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Ugyldig bruger-ID i token"
-            )
-        return None
+        return None, "Ugyldig eller udløbet session"
 
     try:
-        user_id = int(sub)
-    except (ValueError, TypeError):
-        if raise_on_error:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Ugyldig bruger-ID i token"
-            )
-        return None
-
-    user = db.get(User, user_id)
-
-    if not user:
-        if raise_on_error:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Bruger ikke fundet"
-            )
-        return None
+        user_id = int(payload["sub"])
+    except (KeyError, ValueError, TypeError):
+        return None, "Ugyldig bruger-ID i token"
+
+    user = _USER_CACHE.get(user_id)
+    if user is None:
+        user = db.get(User, user_id)
+        if user is None:
+            return None, "Bruger ikke fundet"
+        # Detach before caching so later requests don't touch a closed session
+        db.expunge(user)
+        _USER_CACHE[user_id] = user
+
+    return user, ""
 
-    return user
+
+def get_current_user_claims(
+    access_token: Optional[str] = Cookie(default=None)
+) -> dict:
+    """Resolve user identity from the token alone, without touching the database.
+
+    For endpoints that only need id/username (e.g. /api/auth/me) — the JWT
+    already carries both claims, so no session or SELECT is needed.
+    """
+    if not access_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Ikke logget ind"
+        )
+
+    payload = decode_token(access_token)
+    if not payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Ugyldig eller udløbet session"
+        )
+
+    try:
+        user_id = int(payload["sub"])
+    except (KeyError, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Ugyldig bruger-ID i token"
+        )
+
+    return {"id": user_id, "username": payload.get("username")}
 
 
 def get_current_user(
@@ -82,10 +86,9 @@ def get_current_user(
     db: Session = Depends(get_db)
 ) -> User:
     """Get the current authenticated user from JWT cookie."""
-    user = _validate_token_and_get_user(access_token, db, raise_on_error=True)
-    # Type narrowing: we know user is not None because raise_on_error=True
+    user, reason = _resolve_user(access_token, db)
     if user is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Bruger ikke fundet")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=reason)
     return user
 
 
@@ -94,4 +97,5 @@ def get_optional_user(
     db: Session = Depends(get_db)
 ) -> Optional[User]:
     """Get current user if logged in, None otherwise."""
-    return _validate_token_and_get_user(access_token, db, raise_on_error=False)
+    user, _ = _resolve_user(access_token, db)
+    return user
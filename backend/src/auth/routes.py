@@ -1,13 +1,14 @@
 """Auth routes: register, login, logout."""
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Cookie, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, EmailStr, Field
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy.exc import IntegrityError
 
 from ..database import get_db, User
-from .utils import hash_password, verify_password, create_access_token
-from .deps import get_current_user
+from .utils import hash_password, verify_password, create_access_token, decode_token, DUMMY_HASH
+from .deps import get_current_user_claims, invalidate_user_cache
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
@@ -23,54 +24,64 @@ class LoginRequest(BaseModel):
     password: str = Field(..., max_length=72)
 
 
-class UserResponse(BaseModel):
-    id: int
-    username: str
-    email: Optional[str] = None
-
-    class Config:
-        from_attributes = True
+def _user_response(user: User) -> dict:
+    """Build the user response by direct attribute access, skipping re-validation."""
+    return {"id": user.id, "username": user.username, "email": user.email}
 
 
-@router.post("/register", response_model=UserResponse)
-def register(
+@router.post("/register")
+async def register(
     request: RegisterRequest,
     response: Response,
     db: Session = Depends(get_db)
 ):
     """Register a new user."""
-    # Check if username exists
-    existing = db.query(User).filter(User.username == request.username).first()
-    if existing:
+    # Existence checks without hydrating full User rows
+    username_taken = db.query(
+        db.query(User).filter(User.username == request.username).exists()
+    ).scalar()
+    if username_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Brugernavnet er allerede taget"
         )
 
-    # Check if email already exists
     if request.email:
-        existing_email = db.query(User).filter(User.email == request.email).first()
-        if existing_email:
+        email_taken = db.query(
+            db.query(User).filter(User.email == request.email).exists()
+        ).scalar()
+        if email_taken:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email er allerede i brug"
             )
 
-    # Create user
+    # Create user (bcrypt is ~250ms of CPU, keep it off the event loop)
+    password_hash = await run_in_threadpool(hash_password, request.password)
     user = User(
         username=request.username,
-        password_hash=hash_password(request.password),
+        password_hash=password_hash,
         email=request.email
     )
     db.add(user)
     try:
+        # No refresh needed: the PK is populated on flush and the response
+        # only uses id/username/email
         db.commit()
-        db.refresh(user)
-    except IntegrityError:
+    except IntegrityError as e:
         db.rollback()
+        # A concurrent registration won the race past the pre-checks;
+        # inspect the failed constraint so the message matches theirs
+        constraint = str(e.orig)
+        if "users.username" in constraint:
+            detail = "Brugernavnet er allerede taget"
+        elif "users.email" in constraint:
+            detail = "Email er allerede i brug"
+        else:
+            detail = "Brugernavn eller email er allerede i brug"
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Brugernavn eller email er allerede i brug"
+            detail=detail
         )
 
     # Set auth cookie
@@ -84,23 +95,25 @@ def register(
         max_age=60 * 60 * 24 * 30  # 30 days
     )
 
-    return user
+    return _user_response(user)
 
 
-@router.post("/login", response_model=UserResponse)
-def login(
+@router.post("/login")
+async def login(
     request: LoginRequest,
     response: Response,
     db: Session = Depends(get_db)
 ):
     """Login and get auth cookie."""
-    user = db.query(User).filter(User.username == request.username).first()
+    # Only the columns the handler touches — skips hydrating created_at etc.
+    user = db.query(User).options(
+        load_only(User.id, User.username, User.password_hash, User.email)
+    ).filter(User.username == request.username).first()
 
     # Always verify password to prevent timing attacks for user enumeration
     # Use a dummy hash if user doesn't exist to maintain constant time
-    dummy_hash = "$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/X4m9JHXQa7x4.0Z7q"
-    password_hash = user.password_hash if user else dummy_hash
-    password_valid = verify_password(request.password, password_hash)
+    password_hash = user.password_hash if user else DUMMY_HASH
+    password_valid = await run_in_threadpool(verify_password, request.password, password_hash)
 
     if not user or not password_valid:
         raise HTTPException(
@@ -119,17 +132,26 @@ def login(
         max_age=60 * 60 * 24 * 30
     )
 
-    return user
+    return _user_response(user)
 
 
 @router.post("/logout")
-def logout(response: Response):
+def logout(response: Response, access_token: Optional[str] = Cookie(default=None)):
     """Logout by clearing the auth cookie."""
+    # Drop the cached user snapshot so the logout takes effect immediately
+    if access_token:
+        payload = decode_token(access_token)
+        if payload:
+            try:
+                invalidate_user_cache(int(payload.get("sub", "")))
+            except (ValueError, TypeError):
+                pass
+
     response.delete_cookie(key="access_token", httponly=True, secure=True, samesite="lax")
     return {"message": "Logget ud"}
 
 
-@router.get("/me", response_model=UserResponse)
-def get_me(user: User = Depends(get_current_user)):
-    """Get the current logged-in user."""
-    return user
+@router.get("/me")
+def get_me(claims: dict = Depends(get_current_user_claims)):
+    """Get the current logged-in user (from token claims, no DB hit)."""
+    return claims
@@ -1,16 +1,41 @@
 """Auth utilities: password hashing and JWT tokens."""
-from datetime import datetime, timedelta
+import hashlib
+import threading
+import time
 from typing import Optional
 
 import bcrypt
-from jose import jwt, JWTError
+import jwt
+from cachetools import TTLCache
+from jwt import InvalidTokenError
 
-from ..config import JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRE_DAYS
+from ..config import (
+    JWT_SECRET,
+    JWT_SECRET_BYTES,
+    JWT_ALGORITHM,
+    JWT_ALGORITHMS,
+    JWT_EXPIRE_DAYS,
+    BCRYPT_ROUNDS,
+)
+
+# Cache decoded payloads briefly so repeated requests from the same client
+# skip the HMAC verification. Keyed by a hash of the token, never the token itself.
+_TOKEN_CACHE_TTL = 30
+_TOKEN_CACHE: TTLCache = TTLCache(maxsize=10000, ttl=_TOKEN_CACHE_TTL)
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+# Negative cache: a client retrying with an expired or garbage cookie would
+# otherwise pay full HMAC verification on every request. Short TTL so a
+# token that becomes valid (e.g. after secret rotation) isn't locked out long.
+_NEG_CACHE: TTLCache = TTLCache(maxsize=20000, ttl=10)
+
+# Built once so the non-cached decode path allocates nothing per call
+_DECODE_OPTIONS = {"require": ["exp", "sub"]}
 
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt."""
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
 
 
 def verify_password(password: str, hashed: str) -> bool:
@@ -18,21 +43,50 @@ def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode(), hashed.encode())
 
 
+# Verified against instead of a real hash when the username doesn't exist,
+# so login timing doesn't reveal whether a user exists. Computed once at
+# import so its cost factor always matches BCRYPT_ROUNDS.
+DUMMY_HASH = hash_password("!invalid!")
+
+
 def create_access_token(user_id: int, username: str) -> str:
     """Create a JWT access token."""
-    expire = datetime.utcnow() + timedelta(days=JWT_EXPIRE_DAYS)
     payload = {
         "sub": str(user_id),
         "username": username,
-        "exp": expire
+        "exp": int(time.time()) + JWT_EXPIRE_DAYS * 86400
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
 
 def decode_token(token: str) -> Optional[dict]:
-    """Decode and validate a JWT token."""
+    """Decode and validate a JWT token. Caches valid payloads briefly."""
+    key = hashlib.sha256(token.encode()).digest()[:16]
+
+    with _TOKEN_CACHE_LOCK:
+        cached = _TOKEN_CACHE.get(key)
+        if cached is None and key in _NEG_CACHE:
+            return None
+    if cached is not None:
+        return cached
+
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return payload
-    except JWTError:
+        payload = jwt.decode(
+            token,
+            JWT_SECRET_BYTES,
+            algorithms=JWT_ALGORITHMS,
+            options=_DECODE_OPTIONS,
+        )
+    except InvalidTokenError:
+        with _TOKEN_CACHE_LOCK:
+            _NEG_CACHE[key] = True
         return None
+
+    # Only cache if the token won't expire within the cache TTL,
+    # so a cache hit can never outlive the real exp claim.
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)) and exp > time.time() + _TOKEN_CACHE_TTL:
+        with _TOKEN_CACHE_LOCK:
+            _TOKEN_CACHE[key] = payload
+
+    return payload
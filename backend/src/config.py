@@ -1,6 +1,5 @@
 """Configuration loaded from environment variables."""
 import os
-import secrets
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -13,9 +12,16 @@ DATABASE_PATH = Path(os.getenv("DATABASE_PATH", Path(__file__).parent.parent / "
 DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
 # Auth
-JWT_SECRET = os.getenv("JWT_SECRET", secrets.token_urlsafe(32))
+# No generated fallback: a per-process random secret would make every worker
+# reject the other workers' tokens and log users out on each restart.
+JWT_SECRET = os.getenv("JWT_SECRET")
+if not JWT_SECRET:
+    raise RuntimeError("JWT_SECRET must be set (see backend/.env)")
+JWT_SECRET_BYTES = JWT_SECRET.encode()  # Pre-encoded for decode_token's hot path
 JWT_ALGORITHM = "HS256"
+JWT_ALGORITHMS = [JWT_ALGORITHM]
 JWT_EXPIRE_DAYS = 30
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))  # Lower = faster login/register
 
 # OpenAI (Whisper)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -33,4 +39,4 @@ PORT = int(os.getenv("LYD_TIL_TEKST_PORT", "8090"))
 
 # File upload
 MAX_UPLOAD_SIZE = 100 * 1024 * 1024  # 100MB for long recordings
-ALLOWED_AUDIO_EXTENSIONS = {".m4a", ".mp3", ".wav", ".ogg", ".webm", ".mp4", ".aac", ".flac"}
+ALLOWED_AUDIO_EXTENSIONS = frozenset({".m4a", ".mp3", ".wav", ".ogg", ".webm", ".mp4", ".aac", ".flac"})
@@ -1,7 +1,7 @@
 """Database setup and models using SQLAlchemy."""
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import create_engine, Column, Integer, String, Float, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import create_engine, event, text, Column, Index, Integer, String, Float, Text, DateTime, ForeignKey, Boolean
 from sqlalchemy.orm import sessionmaker, relationship, declarative_base
 
 from .config import DATABASE_URL, DATABASE_PATH
@@ -9,8 +9,36 @@ from .config import DATABASE_URL, DATABASE_PATH
 # Ensure data directory exists
 DATABASE_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Shared compiled-statement cache so the hot per-request queries skip SQL compilation
+_COMPILED_CACHE: dict = {}
+
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    execution_options={"compiled_cache": _COMPILED_CACHE},
+)
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune SQLite for concurrent web traffic.
+
+    WAL lets readers proceed while a writer commits, and synchronous=NORMAL
+    avoids an fsync per commit (still durable in WAL mode short of power loss).
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+# expire_on_commit=False: objects stay usable after commit without a re-SELECT
+# when FastAPI serializes the response.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 Base = declarative_base()
 
 
@@ -21,7 +49,7 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(50), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
-    email = Column(String(255), nullable=True)  # Optional, for password reset
+    email = Column(String(255), unique=True, nullable=True, index=True)  # Optional, for password reset
     created_at = Column(DateTime, default=datetime.utcnow)
 
     transcriptions = relationship("Transcription", back_populates="user")
@@ -32,6 +60,11 @@ class User(Base):
 class Transcription(Base):
     """Audio transcription with optional AI processing."""
     __tablename__ = "transcriptions"
+    __table_args__ = (
+        # History listing filters on user and orders by created_at DESC;
+        # SQLite walks the index backwards for the descending order
+        Index("ix_transcriptions_user_created", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -56,6 +89,15 @@ class Transcription(Base):
 class StyleGuide(Base):
     """User-defined style guide for text processing."""
     __tablename__ = "style_guides"
+    __table_args__ = (
+        # Matches the list query: filter on user, order by is_default/name
+        Index("ix_style_guides_user_list", "user_id", "is_default", "name"),
+        # At most one default style guide per user, enforced by the DB
+        Index(
+            "ux_style_guides_default", "user_id",
+            unique=True, sqlite_where=text("is_default"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -97,6 +139,10 @@ class ImageGeneration(Base):
 class ApiUsage(Base):
     """Track API usage and costs per user."""
     __tablename__ = "api_usage"
+    __table_args__ = (
+        # Usage listing and summaries filter on user and order/group by time
+        Index("ix_api_usage_user_created", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -126,11 +172,39 @@ class ApiUsage(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     user = relationship("User", back_populates="api_usage")
+    # lazy="raise": accessing these without selectinload()/joinedload() on the
+    # query is an error, so a future response field can't silently turn a
+    # list endpoint into N+1 queries
+    transcription = relationship("Transcription", lazy="raise")
+    style_guide = relationship("StyleGuide", lazy="raise")
 
 
 def init_db():
     """Create all tables."""
     Base.metadata.create_all(bind=engine)
+    # create_all doesn't alter existing tables, so ensure the email index
+    # exists on databases created before it was added to the model.
+    with engine.connect() as conn:
+        conn.exec_driver_sql(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users (email)"
+        )
+        conn.exec_driver_sql(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_style_guides_default "
+            "ON style_guides (user_id) WHERE is_default"
+        )
+        conn.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_style_guides_user_list "
+            "ON style_guides (user_id, is_default, name)"
+        )
+        conn.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_transcriptions_user_created "
+            "ON transcriptions (user_id, created_at)"
+        )
+        conn.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_api_usage_user_created "
+            "ON api_usage (user_id, created_at)"
+        )
+        conn.commit()
 
 
 def get_db():
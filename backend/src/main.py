@@ -1,4 +1,5 @@
 """FastAPI application for Lyd til Tekst."""
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
@@ -10,6 +11,8 @@ from .auth.routes import router as auth_router
 from .transcription.routes import router as transcription_router
 from .settings.routes import router as settings_router
 from .usage.routes import router as usage_router
+from .utils import usage_buffer
+from .utils import cost_calculator
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -23,16 +26,21 @@ async def lifespan(app: FastAPI):
     logger.info("Initializing database...")
     init_db()
     logger.info("Database initialized")
+    flush_task = asyncio.create_task(usage_buffer.flush_loop())
+    rate_task = asyncio.create_task(cost_calculator.refresh_loop())
     yield
     # Shutdown
     logger.info("Shutting down...")
+    flush_task.cancel()
+    rate_task.cancel()
+    usage_buffer.flush()  # Don't lose buffered usage rows on restart
 
 
 app = FastAPI(
     title="Lyd til Tekst",
     description="Diktat-værktøj: Upload lydfil → Whisper transskription → Gemini bearbejdning",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
 )
 
 # CORS for frontend
@@ -1,20 +1,35 @@
 """Settings routes: style guides management."""
+import asyncio
 from typing import List, Optional
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session
 
-from ..database import get_db, StyleGuide, User, ApiUsage
+from ..database import get_db, ApiUsage, StyleGuide, User
 from ..auth.deps import get_current_user
 from ..config import GEMINI_MODEL
 from ..utils.cost_calculator import calculate_gemini_cost
+from ..utils.usage_buffer import add_usage
 from .style_generator import generate_style_guide
 
 router = APIRouter(prefix="/api/settings", tags=["settings"])
 
 
+def _get_guide_or_404(db: Session, id: int, user_id: int) -> StyleGuide:
+    """Fetch a style guide by PK (identity-map fast path) and check ownership."""
+    guide = db.get(StyleGuide, id)
+    if not guide or guide.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Stilguide ikke fundet"
+        )
+    return guide
+
+
 class StyleGuideCreate(BaseModel):
     name: str
     description: Optional[str] = None  # What type of text (Facebook post, article, etc.)
@@ -38,20 +53,65 @@ class StyleGuideResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StyleGuideListItemResponse(BaseModel):
+    """Slim list entry: heavy TEXT columns are left out of the list query."""
+    id: int
+    name: str
+    description: Optional[str] = None
+    is_default: bool
+    has_content: bool  # Whether guide_content has been generated
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Built once: validates/serializes the whole list in pydantic-core instead of
+# FastAPI re-validating field by field per response
+_LIST_ADAPTER = TypeAdapter(List[StyleGuideListItemResponse])
 
 
-@router.get("/style-guides", response_model=List[StyleGuideResponse])
+@router.get("/style-guides", response_model=List[StyleGuideListItemResponse])
 def list_style_guides(
+    request: Request,
+    response: Response,
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """List all style guides for the current user."""
-    guides = db.query(StyleGuide).filter(
+    """List all style guides for the current user.
+
+    Projects only the list columns — `examples` and `guide_content` can be
+    tens of KB each and the list view never shows them; the frontend fetches
+    the full guide when one is opened for editing.
+    """
+    # Cheap aggregate ETag: count catches deletes, max(updated_at) catches
+    # edits. A matching If-None-Match skips the row fetch and serialization.
+    count, max_updated = db.query(
+        func.count(StyleGuide.id), func.max(StyleGuide.updated_at)
+    ).filter(StyleGuide.user_id == user.id).one()
+    etag = f'W/"{count}-{max_updated.timestamp() if max_updated else 0}"'
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED)
+
+    rows = db.query(
+        StyleGuide.id,
+        StyleGuide.name,
+        StyleGuide.description,
+        StyleGuide.is_default,
+        StyleGuide.guide_content.isnot(None).label("has_content"),
+        StyleGuide.created_at,
+        StyleGuide.updated_at,
+    ).filter(
         StyleGuide.user_id == user.id
     ).order_by(StyleGuide.is_default.desc(), StyleGuide.name).all()
-    return guides
+    # One pydantic-core call validates the whole page; FastAPI's default
+    # path then serializes the models straight to JSON bytes (faster than
+    # the deprecated explicit ORJSONResponse)
+    response.headers["ETag"] = etag
+    return _LIST_ADAPTER.validate_python(rows, from_attributes=True)
 
 
 @router.post("/style-guides", response_model=StyleGuideResponse)
@@ -82,20 +142,17 @@ def create_style_guide(
 @router.get("/style-guides/{id}", response_model=StyleGuideResponse)
 def get_style_guide(
     id: int,
+    request: Request,
+    response: Response,
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get a specific style guide."""
-    guide = db.query(StyleGuide).filter(
-        StyleGuide.id == id,
-        StyleGuide.user_id == user.id
-    ).first()
-
-    if not guide:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Stilguide ikke fundet"
-        )
+    guide = _get_guide_or_404(db, id, user.id)
+    etag = f'W/"{guide.updated_at.timestamp() if guide.updated_at else 0}"'
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    response.headers["ETag"] = etag
     return guide
 
 
@@ -107,16 +164,7 @@ def update_style_guide(
     db: Session = Depends(get_db)
 ):
     """Update a style guide."""
-    guide = db.query(StyleGuide).filter(
-        StyleGuide.id == id,
-        StyleGuide.user_id == user.id
-    ).first()
-
-    if not guide:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Stilguide ikke fundet"
-        )
+    guide = _get_guide_or_404(db, id, user.id)
 
     if data.name is not None:
         guide.name = data.name.strip()
@@ -139,39 +187,26 @@ def delete_style_guide(
     db: Session = Depends(get_db)
 ):
     """Delete a style guide."""
-    guide = db.query(StyleGuide).filter(
-        StyleGuide.id == id,
-        StyleGuide.user_id == user.id
-    ).first()
-
-    if not guide:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Stilguide ikke fundet"
-        )
+    guide = _get_guide_or_404(db, id, user.id)
 
+    # Usage rows keep their cost data but drop the reference; with
+    # foreign_keys=ON the delete would otherwise violate the FK
+    db.query(ApiUsage).filter(ApiUsage.style_guide_id == id).update(
+        {"style_guide_id": None}, synchronize_session=False
+    )
     db.delete(guide)
     db.commit()
     return {"message": "Stilguide slettet"}
 
 
 @router.post("/style-guides/{id}/generate", response_model=StyleGuideResponse)
-def regenerate_style_guide(
+async def regenerate_style_guide(
     id: int,
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Generate/regenerate style guide content from examples using Gemini."""
-    guide = db.query(StyleGuide).filter(
-        StyleGuide.id == id,
-        StyleGuide.user_id == user.id
-    ).first()
-
-    if not guide:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Stilguide ikke fundet"
-        )
+    guide = _get_guide_or_404(db, id, user.id)
 
     if not guide.examples or not guide.examples.strip():
         raise HTTPException(
@@ -179,7 +214,8 @@ def regenerate_style_guide(
             detail="Ingen teksteksempler at generere fra"
         )
 
-    result = generate_style_guide(guide.examples, guide.description)
+    # The Gemini round-trip takes seconds; don't hold a worker thread for it
+    result = await run_in_threadpool(generate_style_guide, guide.examples, guide.description)
 
     if not result.success:
         raise HTTPException(
@@ -189,9 +225,9 @@ def regenerate_style_guide(
 
     guide.guide_content = result.content
 
-    # Log API usage for Gemini
+    # Log API usage for Gemini (buffered, inserted off the request path)
     if result.input_tokens > 0 or result.output_tokens > 0:
-        usage = ApiUsage(
+        add_usage(
             user_id=user.id,
             provider="gemini",
             model=GEMINI_MODEL,
@@ -202,39 +238,97 @@ def regenerate_style_guide(
             cost_usd=calculate_gemini_cost(result.input_tokens, result.output_tokens, GEMINI_MODEL),
             style_guide_id=guide.id
         )
-        db.add(usage)
 
+    # Only the guide update is committed here; the usage row goes through the
+    # buffered writer and never blocks the response
     db.commit()
-    db.refresh(guide)
     return guide
 
 
-@router.put("/style-guides/{id}/default", response_model=StyleGuideResponse)
-def set_default_style_guide(
-    id: int,
+class StyleGuideBatchGenerate(BaseModel):
+    ids: List[int]
+
+
+@router.post("/style-guides/batch-generate", response_model=List[StyleGuideResponse])
+async def batch_generate_style_guides(
+    data: StyleGuideBatchGenerate,
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Set a style guide as the default for this user."""
-    guide = db.query(StyleGuide).filter(
-        StyleGuide.id == id,
-        StyleGuide.user_id == user.id
-    ).first()
+    """Generate content for several style guides concurrently.
 
-    if not guide:
+    The Gemini calls run in parallel, so a bulk regenerate takes roughly
+    one round-trip instead of one per guide. Updates are committed in a
+    single transaction; if any guide fails, nothing is persisted.
+    """
+    if not data.ids:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Stilguide ikke fundet"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Ingen stilguides angivet"
         )
 
-    # Remove default from all other guides
-    db.query(StyleGuide).filter(
-        StyleGuide.user_id == user.id,
-        StyleGuide.id != id
-    ).update({"is_default": False})
+    guides = [_get_guide_or_404(db, guide_id, user.id) for guide_id in data.ids]
+    for guide in guides:
+        if not guide.examples or not guide.examples.strip():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Stilguide '{guide.name}' har ingen teksteksempler"
+            )
+
+    results = await asyncio.gather(*(
+        run_in_threadpool(generate_style_guide, guide.examples, guide.description)
+        for guide in guides
+    ))
+
+    # Token usage is billed whether or not the batch commits, so log it first
+    for guide, result in zip(guides, results):
+        if result.input_tokens > 0 or result.output_tokens > 0:
+            add_usage(
+                user_id=user.id,
+                provider="gemini",
+                model=GEMINI_MODEL,
+                operation="generate_style",
+                api_tier=result.api_tier,
+                input_tokens=result.input_tokens,
+                output_tokens=result.output_tokens,
+                cost_usd=calculate_gemini_cost(result.input_tokens, result.output_tokens, GEMINI_MODEL),
+                style_guide_id=guide.id
+            )
+
+    errors = [
+        f"{guide.name}: {result.error}"
+        for guide, result in zip(guides, results) if not result.success
+    ]
+    if errors:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="; ".join(errors)
+        )
 
-    # Set this one as default
+    for guide, result in zip(guides, results):
+        guide.guide_content = result.content
+    db.commit()
+    return guides
+
+
+@router.put("/style-guides/{id}/default", response_model=StyleGuideResponse)
+def set_default_style_guide(
+    id: int,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Set a style guide as the default for this user."""
+    guide = _get_guide_or_404(db, id, user.id)
+
+    # Clear the old default before setting the new one: SQLite checks the
+    # partial unique index row by row, so a single UPDATE flipping both rows
+    # fails whenever the new default has the smaller id. The transaction
+    # keeps the flip atomic; no other session sees the in-between state.
+    db.execute(
+        update(StyleGuide)
+        .where(StyleGuide.user_id == user.id, StyleGuide.is_default, StyleGuide.id != id)
+        .values(is_default=False)
+    )
     guide.is_default = True
     db.commit()
-    db.refresh(guide)
     return guide
@@ -1,12 +1,15 @@
 """Generate style guides from text examples using Gemini."""
 import logging
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
 from google import genai
 from google.genai import types
 
 from ..config import GEMINI_API_KEY_FREE, GEMINI_API_KEY_PAID, GEMINI_MODEL
+from ..utils.llm_cache import make_key, cache_get, cache_put, acquire_flight, release_flight
+from ..utils.tier_health import record_free_result, free_tier_healthy
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +43,59 @@ Lav en stilguide der beskriver:
 Skriv stilguiden som klare, konkrete instruktioner der kan bruges til at skrive i samme stil.
 Output kun stilguiden, ingen indledning eller forklaring."""
 
+# Template split once at import; joining the parts is a single pass and is
+# still safe for curly braces in user examples (no str.format involved)
+_PROMPT_HEAD, _rest = STYLE_GUIDE_PROMPT.split("{description_section}")
+_PROMPT_MID, _PROMPT_TAIL = _rest.split("{examples}")
+del _rest
+
+# Cap on example text sent to Gemini (~8k tokens at ~4 chars/token).
+# Style analysis doesn't need every byte, and input tokens are billed linearly.
+MAX_EXAMPLE_CHARS = 32000
+
+
+def _truncate_examples(examples: str, max_chars: int = MAX_EXAMPLE_CHARS) -> str:
+    """Trim oversized examples to whole paragraphs within the budget.
+
+    Paragraphs are taken alternately from the start and end of the text so
+    the sample covers both early and late writing rather than just the top.
+    """
+    if len(examples) <= max_chars:
+        return examples
+
+    paragraphs = examples.split("\n\n")
+    head: list = []
+    tail: list = []
+    remaining = max_chars
+    front, back = 0, len(paragraphs) - 1
+    take_front = True
+    while front <= back:
+        source = paragraphs[front] if take_front else paragraphs[back]
+        if len(source) + 2 > remaining:
+            # Paragraph doesn't fit the remaining budget: skip it and keep
+            # trying the other end — smaller paragraphs may still fit
+            if take_front:
+                front += 1
+            else:
+                back -= 1
+            take_front = not take_front
+            continue
+        if take_front:
+            head.append(source)
+            front += 1
+        else:
+            tail.append(source)
+            back -= 1
+        remaining -= len(source) + 2
+        take_front = not take_front
+
+    result = "\n\n".join(head + tail[::-1])
+    if not result:
+        # No whole paragraph fit (e.g. one huge block pasted without blank
+        # lines): hard-slice rather than sending Gemini zero examples
+        return examples[:max_chars]
+    return result
+
 
 def generate_style_guide(examples: str, description: Optional[str] = None) -> GenerationResult:
     """
@@ -63,34 +119,60 @@ def generate_style_guide(examples: str, description: Optional[str] = None) -> Ge
     if description and description.strip():
         description_section = f"\nTEKSTTYPE/FORMÅL:\n{description.strip()}\n"
 
-    # Use replace instead of format to avoid KeyError on curly braces in examples
-    prompt = STYLE_GUIDE_PROMPT.replace(
-        "{description_section}", description_section
-    ).replace("{examples}", examples)
+    examples = _truncate_examples(examples)
+    prompt = "".join((_PROMPT_HEAD, description_section, _PROMPT_MID, examples, _PROMPT_TAIL))
+
+    # Re-generating from unchanged examples is served from cache
+    cache_key = make_key(GEMINI_MODEL, prompt, 0.4, 2000)
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return GenerationResult(success=True, content=cached, api_tier="cache")
 
-    # Try free tier first
-    if GEMINI_API_KEY_FREE:
-        result = _generate_with_gemini(prompt, GEMINI_API_KEY_FREE, tier="free")
-        if result.success:
-            return result
+    # Coalesce identical in-flight requests (e.g. a double-clicked regenerate)
+    is_leader, flight = acquire_flight(cache_key)
+    if not is_leader:
+        flight.wait(timeout=60)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return GenerationResult(success=True, content=cached, api_tier="cache")
+        # Leader failed or timed out — fall through and try ourselves
 
-    # Fallback to paid tier
-    if GEMINI_API_KEY_PAID:
-        result = _generate_with_gemini(prompt, GEMINI_API_KEY_PAID, tier="paid")
-        if result.success:
-            return result
-        logger.error("Style guide generation failed on paid tier: %s", result.error)
+    try:
+        # Free tier first while it's healthy; paid first when free has been failing
+        tiers = [("free", GEMINI_API_KEY_FREE), ("paid", GEMINI_API_KEY_PAID)]
+        if not free_tier_healthy():
+            tiers.reverse()
+
+        for tier, api_key in tiers:
+            if not api_key:
+                continue
+            result = _generate_with_gemini(prompt, api_key, tier=tier)
+            if tier == "free":
+                record_free_result(result.success)
+            if result.success:
+                cache_put(cache_key, result.content)
+                return result
+            logger.error("Style guide generation failed on %s tier: %s", tier, result.error)
 
-    return GenerationResult(
-        success=False,
-        error="Kunne ikke generere stilguide - ingen API keys eller begge fejlede"
-    )
+        return GenerationResult(
+            success=False,
+            error="Kunne ikke generere stilguide - ingen API keys eller begge fejlede"
+        )
+    finally:
+        if is_leader:
+            release_flight(cache_key, flight)
+
+
+@lru_cache(maxsize=4)
+def _get_client(api_key: str):
+    """One client per API key: reuses the HTTP connection pool across requests."""
+    return genai.Client(api_key=api_key)
 
 
 def _generate_with_gemini(prompt: str, api_key: str, tier: str = "paid") -> GenerationResult:
     """Generate using Google Gemini API."""
     try:
-        client = genai.Client(api_key=api_key)
+        client = _get_client(api_key)
 
         response = client.models.generate_content(
             model=GEMINI_MODEL,
@@ -101,12 +183,13 @@ def _generate_with_gemini(prompt: str, api_key: str, tier: str = "paid") -> Gene
             )
         )
 
-        # Extract token counts from usage metadata
-        input_tokens = 0
-        output_tokens = 0
-        if hasattr(response, 'usage_metadata') and response.usage_metadata:
-            input_tokens = getattr(response.usage_metadata, 'prompt_token_count', 0) or 0
-            output_tokens = getattr(response.usage_metadata, 'candidates_token_count', 0) or 0
+        # Extract token counts; the SDK populates usage_metadata on success
+        try:
+            usage = response.usage_metadata
+            input_tokens = usage.prompt_token_count or 0
+            output_tokens = usage.candidates_token_count or 0
+        except AttributeError:
+            input_tokens = output_tokens = 0
 
         try:
             response_text = response.text.strip()
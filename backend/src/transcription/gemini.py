@@ -2,9 +2,12 @@
 import json
 import re
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
 from ..config import GEMINI_API_KEY_FREE, GEMINI_API_KEY_PAID, GEMINI_MODEL
+from ..utils.llm_cache import make_key, cache_get, cache_put, acquire_flight, release_flight
+from ..utils.tier_health import record_free_result, free_tier_healthy
 
 
 @dataclass
@@ -33,6 +36,19 @@ Retningslinjer:
 - Skriv KUN det bearbejdede resultat, ingen indledning eller forklaring"""
 
 
+@lru_cache(maxsize=256)
+def _build_system_prompt(style_guide: Optional[str]) -> str:
+    """Assemble the system prompt, reusing the string for a repeated guide.
+
+    A user's default style guide rarely changes, so across thousands of
+    dictations the same multi-KB concatenation would otherwise be rebuilt
+    every call.
+    """
+    if not style_guide:
+        return SYSTEM_PROMPT
+    return f"{SYSTEM_PROMPT}\n\nBRUGERENS STILGUIDE:\n{style_guide}"
+
+
 def process_text(raw_text: str, instruction: str, style_guide: Optional[str] = None) -> ProcessingResult:
     """
     Process transcribed text with Gemini based on user instruction.
@@ -57,38 +73,64 @@ def process_text(raw_text: str, instruction: str, style_guide: Optional[str] = N
 BRUGERENS INSTRUKS:
 {instruction}"""
 
-    # Build system prompt with optional style guide
-    system_prompt = SYSTEM_PROMPT
-    if style_guide:
-        system_prompt = f"{SYSTEM_PROMPT}\n\nBRUGERENS STILGUIDE:\n{style_guide}"
+    system_prompt = _build_system_prompt(style_guide)
+
+    # Identical re-runs (same text, instruction and style guide) are served
+    # from cache without a Gemini call
+    cache_key = make_key(GEMINI_MODEL, system_prompt, prompt, 0.3, 8000)
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return ProcessingResult(success=True, text=cached, api_tier="cache")
+
+    # Coalesce identical in-flight requests: followers wait for the leader's
+    # result instead of firing a duplicate Gemini call
+    is_leader, flight = acquire_flight(cache_key)
+    if not is_leader:
+        flight.wait(timeout=60)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return ProcessingResult(success=True, text=cached, api_tier="cache")
+        # Leader failed or timed out — fall through and try ourselves
+
+    try:
+        # Free tier first while it's healthy; paid first when free has been failing
+        tiers = [("free", GEMINI_API_KEY_FREE), ("paid", GEMINI_API_KEY_PAID)]
+        if not free_tier_healthy():
+            tiers.reverse()
+
+        for tier, api_key in tiers:
+            if not api_key:
+                continue
+            result = _process_with_gemini(prompt, api_key, system_prompt, tier=tier)
+            if tier == "free":
+                record_free_result(result.success)
+            if result.success:
+                cache_put(cache_key, result.text)
+                return result
+            print(f"  Gemini {tier} tier fejlede: {result.error}")
 
-    # Try free tier first
-    if GEMINI_API_KEY_FREE:
-        result = _process_with_gemini(prompt, GEMINI_API_KEY_FREE, system_prompt, tier="free")
-        if result.success:
-            return result
-        print(f"  Gemini free tier fejlede: {result.error}, prøver paid tier...")
+        return ProcessingResult(
+            success=False,
+            error="Ingen Gemini API keys konfigureret eller begge fejlede"
+        )
+    finally:
+        if is_leader:
+            release_flight(cache_key, flight)
 
-    # Fallback to paid tier
-    if GEMINI_API_KEY_PAID:
-        result = _process_with_gemini(prompt, GEMINI_API_KEY_PAID, system_prompt, tier="paid")
-        if result.success:
-            return result
-        print(f"  Gemini paid tier fejlede: {result.error}")
 
-    return ProcessingResult(
-        success=False,
-        error="Ingen Gemini API keys konfigureret eller begge fejlede"
-    )
+@lru_cache(maxsize=4)
+def _get_client(api_key: str):
+    """One client per API key: reuses the HTTP connection pool across requests."""
+    from google import genai
+    return genai.Client(api_key=api_key)
 
 
 def _process_with_gemini(prompt: str, api_key: str, system_prompt: str, tier: str = "paid") -> ProcessingResult:
     """Process using Google Gemini API."""
     try:
-        from google import genai
         from google.genai import types
 
-        client = genai.Client(api_key=api_key)
+        client = _get_client(api_key)
 
         response = client.models.generate_content(
             model=GEMINI_MODEL,
@@ -100,12 +142,13 @@ def _process_with_gemini(prompt: str, api_key: str, system_prompt: str, tier: st
             )
         )
 
-        # Extract token counts from usage metadata
-        input_tokens = 0
-        output_tokens = 0
-        if hasattr(response, 'usage_metadata') and response.usage_metadata:
-            input_tokens = getattr(response.usage_metadata, 'prompt_token_count', 0) or 0
-            output_tokens = getattr(response.usage_metadata, 'candidates_token_count', 0) or 0
+        # Extract token counts; the SDK populates usage_metadata on success
+        try:
+            usage = response.usage_metadata
+            input_tokens = usage.prompt_token_count or 0
+            output_tokens = usage.candidates_token_count or 0
+        except AttributeError:
+            input_tokens = output_tokens = 0
 
         # Check if response was blocked by safety filters
         try:
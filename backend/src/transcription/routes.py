@@ -1,13 +1,13 @@
 """Transcription routes: upload, list, process."""
-import shutil
-import tempfile
 from pathlib import Path
 from typing import List, Optional
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from ..database import get_db, Transcription, User, StyleGuide, ApiUsage
@@ -23,6 +23,17 @@ router = APIRouter(prefix="/api", tags=["transcription"])
 AUDIO_DIR = Path(__file__).parent.parent.parent / "data" / "audio"
 AUDIO_DIR.mkdir(parents=True, exist_ok=True)
 
+# Media type per audio extension, built once instead of per request
+_MEDIA_TYPES = {
+    ".m4a": "audio/mp4",
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".ogg": "audio/ogg",
+    ".webm": "audio/webm",
+    ".aac": "audio/aac",
+    ".flac": "audio/flac",
+}
+
 
 class TranscriptionResponse(BaseModel):
     id: int
@@ -36,8 +47,7 @@ class TranscriptionResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class TranscriptionListResponse(BaseModel):
@@ -45,6 +55,11 @@ class TranscriptionListResponse(BaseModel):
     total: int
 
 
+# Validates a whole page in one pydantic-core call instead of constructing
+# each response model field by field in Python
+_TRANSCRIPTION_LIST_ADAPTER = TypeAdapter(List[TranscriptionResponse])
+
+
 class UpdateTranscriptionRequest(BaseModel):
     raw_text: Optional[str] = None
 
@@ -64,12 +79,23 @@ def transcription_to_response(t: Transcription) -> TranscriptionResponse:
         raw_text=t.raw_text,
         instruction=t.instruction,
         processed_text=t.processed_text,
-        has_audio=bool(t.audio_path and Path(t.audio_path).exists()),
+        has_audio=bool(t.audio_path),
         created_at=t.created_at,
         updated_at=t.updated_at
     )
 
 
+def _get_transcription_or_404(db: Session, id: int, user_id: int) -> Transcription:
+    """Fetch a transcription by PK (identity-map fast path) and check ownership."""
+    transcription = db.get(Transcription, id)
+    if not transcription or transcription.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Transskription ikke fundet"
+        )
+    return transcription
+
+
 def get_audio_path(user_id: int, transcription_id: int, suffix: str = ".m4a") -> Path:
     """Get the path for storing a user's audio file."""
     user_dir = AUDIO_DIR / str(user_id)
@@ -98,22 +124,37 @@ async def upload_and_transcribe(
             detail=f"Ikke understøttet filtype. Tilladte: {', '.join(ALLOWED_AUDIO_EXTENSIONS)}"
         )
 
-    # Check file size
-    content = await file.read()
-    if len(content) > MAX_UPLOAD_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Filen er for stor. Maksimum: {MAX_UPLOAD_SIZE // (1024*1024)}MB"
-        )
-
-    # Save to temp file
-    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp:
-        temp.write(content)
-        temp_path = Path(temp.name)
+    # Create the row first to reserve an id, then stream the upload straight
+    # to its permanent path — no temp file plus full-file copy afterwards
+    transcription = Transcription(
+        user_id=user.id,
+        filename=file.filename,
+        raw_text=""
+    )
+    db.add(transcription)
+    # Commit immediately so the write transaction stays short: SQLite allows
+    # one writer at a time, and keeping a transaction open across the upload
+    # stream and the Whisper round-trip would block every other write for
+    # the duration. The placeholder row is cleaned up on failure below.
+    db.commit()
 
+    audio_path = get_audio_path(user.id, transcription.id, suffix)
     try:
-        # Transcribe
-        result = transcribe_audio(temp_path, prompt=context or "")
+        # Stream in 1MB chunks: peak memory stays O(chunk) instead of
+        # O(file), and the size limit is enforced as bytes arrive
+        total = 0
+        with open(audio_path, "wb") as out:
+            while chunk := await file.read(1024 * 1024):
+                total += len(chunk)
+                if total > MAX_UPLOAD_SIZE:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Filen er for stor. Maksimum: {MAX_UPLOAD_SIZE // (1024*1024)}MB"
+                    )
+                out.write(chunk)
+
+        # Transcribe (async end-to-end: subprocesses + AsyncOpenAI)
+        result = await transcribe_audio(audio_path, prompt=context or "")
 
         if not result.success:
             raise HTTPException(
@@ -121,20 +162,8 @@ async def upload_and_transcribe(
                 detail=result.error
             )
 
-        # Save to database first to get ID
-        transcription = Transcription(
-            user_id=user.id,
-            filename=file.filename,
-            duration_seconds=result.duration,
-            raw_text=result.text
-        )
-        db.add(transcription)
-        db.commit()
-        db.refresh(transcription)
-
-        # Save audio file permanently
-        audio_path = get_audio_path(user.id, transcription.id, suffix)
-        shutil.copy2(temp_path, audio_path)
+        transcription.duration_seconds = result.duration
+        transcription.raw_text = result.text
         transcription.audio_path = str(audio_path)
 
         # Log API usage for Whisper
@@ -153,10 +182,15 @@ async def upload_and_transcribe(
 
         return transcription_to_response(transcription)
 
-    finally:
-        # Clean up temp file
-        if temp_path.exists():
-            temp_path.unlink()
+    except Exception:
+        # Failed upload/transcription: discard pending changes and remove
+        # the committed placeholder row along with the file
+        if audio_path.exists():
+            audio_path.unlink()
+        db.rollback()
+        db.delete(transcription)
+        db.commit()
+        raise
 
 
 @router.get("/transcriptions", response_model=TranscriptionListResponse)
@@ -167,12 +201,24 @@ def list_transcriptions(
     db: Session = Depends(get_db)
 ):
     """List user's transcriptions, newest first."""
-    query = db.query(Transcription).filter(Transcription.user_id == user.id)
-    total = query.count()
-    transcriptions = query.order_by(Transcription.created_at.desc()).offset(skip).limit(limit).all()
+    # Plain COUNT(id) — query.count() would wrap the filter in a subquery
+    total = db.query(func.count(Transcription.id)).filter(
+        Transcription.user_id == user.id
+    ).scalar()
+    transcriptions = db.query(Transcription).filter(
+        Transcription.user_id == user.id
+    ).order_by(Transcription.created_at.desc()).offset(skip).limit(limit).all()
+
+    # Attach the computed fields, then batch-validate via the adapter.
+    # audio_path is trusted (cleared on delete), so no stat() per row.
+    for t in transcriptions:
+        t.duration_formatted = format_duration(t.duration_seconds)
+        t.has_audio = bool(t.audio_path)
 
     return TranscriptionListResponse(
-        transcriptions=[transcription_to_response(t) for t in transcriptions],
+        transcriptions=_TRANSCRIPTION_LIST_ADAPTER.validate_python(
+            transcriptions, from_attributes=True
+        ),
         total=total
     )
 
@@ -184,16 +230,7 @@ def get_transcription(
     db: Session = Depends(get_db)
 ):
     """Get a specific transcription."""
-    transcription = db.query(Transcription).filter(
-        Transcription.id == id,
-        Transcription.user_id == user.id
-    ).first()
-
-    if not transcription:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Transskription ikke fundet"
-        )
+    transcription = _get_transcription_or_404(db, id, user.id)
 
     return transcription_to_response(transcription)
 
@@ -206,16 +243,7 @@ def update_transcription(
     db: Session = Depends(get_db)
 ):
     """Update a transcription's raw text."""
-    transcription = db.query(Transcription).filter(
-        Transcription.id == id,
-        Transcription.user_id == user.id
-    ).first()
-
-    if not transcription:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Transskription ikke fundet"
-        )
+    transcription = _get_transcription_or_404(db, id, user.id)
 
     if request.raw_text is not None:
         transcription.raw_text = request.raw_text
@@ -227,36 +255,39 @@ def update_transcription(
 
 
 @router.post("/transcriptions/{id}/process", response_model=TranscriptionResponse)
-def process_transcription(
+async def process_transcription(
     id: int,
     request: ProcessRequest,
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Process a transcription with Gemini using the given instruction."""
-    transcription = db.query(Transcription).filter(
-        Transcription.id == id,
-        Transcription.user_id == user.id
-    ).first()
-
-    if not transcription:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Transskription ikke fundet"
-        )
-
-    # Fetch style guide if specified
     style_guide_content = None
     if request.style_guide_id:
-        style_guide = db.query(StyleGuide).filter(
-            StyleGuide.id == request.style_guide_id,
-            StyleGuide.user_id == user.id
+        # One outer-join round-trip fetches the transcription and the style
+        # guide together instead of two sequential SELECTs
+        row = db.query(Transcription, StyleGuide).outerjoin(
+            StyleGuide,
+            (StyleGuide.id == request.style_guide_id) & (StyleGuide.user_id == user.id)
+        ).filter(
+            Transcription.id == id,
+            Transcription.user_id == user.id
         ).first()
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Transskription ikke fundet"
+            )
+        transcription, style_guide = row
         if style_guide and style_guide.guide_content:
             style_guide_content = style_guide.guide_content
+    else:
+        transcription = _get_transcription_or_404(db, id, user.id)
 
-    # Process with Gemini
-    result = process_text(transcription.raw_text, request.instruction, style_guide_content)
+    # Process with Gemini (blocking SDK call, run off the event loop)
+    result = await run_in_threadpool(
+        process_text, transcription.raw_text, request.instruction, style_guide_content
+    )
 
     if not result.success:
         raise HTTPException(
@@ -296,23 +327,17 @@ def delete_transcription(
     db: Session = Depends(get_db)
 ):
     """Delete a transcription and its audio file."""
-    transcription = db.query(Transcription).filter(
-        Transcription.id == id,
-        Transcription.user_id == user.id
-    ).first()
-
-    if not transcription:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Transskription ikke fundet"
-        )
+    transcription = _get_transcription_or_404(db, id, user.id)
 
-    # Delete audio file if exists
+    # Delete audio file if exists (missing_ok: one syscall, no stat first)
     if transcription.audio_path:
-        audio_path = Path(transcription.audio_path)
-        if audio_path.exists():
-            audio_path.unlink()
+        Path(transcription.audio_path).unlink(missing_ok=True)
 
+    # Usage rows keep their cost data but drop the reference; with
+    # foreign_keys=ON the delete would otherwise violate the FK
+    db.query(ApiUsage).filter(ApiUsage.transcription_id == id).update(
+        {"transcription_id": None}, synchronize_session=False
+    )
     db.delete(transcription)
     db.commit()
 
@@ -326,16 +351,7 @@ def get_audio(
     db: Session = Depends(get_db)
 ):
     """Stream the audio file for a transcription."""
-    transcription = db.query(Transcription).filter(
-        Transcription.id == id,
-        Transcription.user_id == user.id
-    ).first()
-
-    if not transcription:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Transskription ikke fundet"
-        )
+    transcription = _get_transcription_or_404(db, id, user.id)
 
     if not transcription.audio_path:
         raise HTTPException(
@@ -344,7 +360,9 @@ def get_audio(
         )
 
     audio_path = Path(transcription.audio_path)
-    if not audio_path.exists():
+    try:
+        stat_result = audio_path.stat()
+    except OSError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Lydfil ikke fundet"
@@ -352,21 +370,20 @@ def get_audio(
 
     # Determine media type from extension
     suffix = audio_path.suffix.lower()
-    media_types = {
-        ".m4a": "audio/mp4",
-        ".mp3": "audio/mpeg",
-        ".wav": "audio/wav",
-        ".ogg": "audio/ogg",
-        ".webm": "audio/webm",
-        ".aac": "audio/aac",
-        ".flac": "audio/flac",
-    }
-    media_type = media_types.get(suffix, "audio/mpeg")
+    media_type = _MEDIA_TYPES.get(suffix, "audio/mpeg")
 
+    # stat_result reuses the stat from the existence check; Accept-Ranges lets
+    # the <audio> element seek with byte-range requests instead of
+    # re-downloading, and the file is immutable so it can be cached client-side
     return FileResponse(
         audio_path,
         media_type=media_type,
-        filename=transcription.filename or f"audio{suffix}"
+        filename=transcription.filename or f"audio{suffix}",
+        stat_result=stat_result,
+        headers={
+            "Accept-Ranges": "bytes",
+            "Cache-Control": "private, max-age=3600",
+        },
     )
 
 
@@ -377,16 +394,7 @@ def delete_audio(
     db: Session = Depends(get_db)
 ):
     """Delete only the audio file, keep the transcription."""
-    transcription = db.query(Transcription).filter(
-        Transcription.id == id,
-        Transcription.user_id == user.id
-    ).first()
-
-    if not transcription:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Transskription ikke fundet"
-        )
+    transcription = _get_transcription_or_404(db, id, user.id)
 
     if not transcription.audio_path:
         raise HTTPException(
@@ -394,10 +402,8 @@ def delete_audio(
             detail="Ingen lydfil tilknyttet"
         )
 
-    # Delete the audio file
-    audio_path = Path(transcription.audio_path)
-    if audio_path.exists():
-        audio_path.unlink()
+    # Delete the audio file (missing_ok: one syscall, no stat first)
+    Path(transcription.audio_path).unlink(missing_ok=True)
 
     # Clear the audio_path in database
     transcription.audio_path = None
@@ -1,13 +1,18 @@
 """Audio transcription using OpenAI Whisper API."""
-import subprocess
+import asyncio
+import re
 from pathlib import Path
 from dataclasses import dataclass
 from typing import Optional
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 from ..config import OPENAI_API_KEY, WHISPER_MODEL, WHISPER_LANGUAGE
 
+# One client for the process: reuses the httpx connection pool across
+# transcriptions instead of paying a TLS handshake per call
+_CLIENT: Optional[AsyncOpenAI] = AsyncOpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+
 
 @dataclass
 class TranscriptionResult:
@@ -18,34 +23,60 @@ class TranscriptionResult:
     error: Optional[str] = None
 
 
-def get_audio_duration(audio_path: Path) -> float:
-    """Get audio duration via ffprobe."""
+# ffmpeg prints "Duration: HH:MM:SS.xx" on stderr during conversion
+_DURATION_RE = re.compile(rb'Duration: (\d+):(\d+):(\d+\.\d+)')
+
+
+async def get_audio_duration(audio_path: Path) -> float:
+    """Get audio duration via ffprobe (fallback when ffmpeg didn't report it)."""
+    proc = await asyncio.create_subprocess_exec(
+        'ffprobe', '-v', 'quiet', '-show_entries', 'format=duration', '-of', 'csv=p=0', str(audio_path),
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout, _ = await proc.communicate()
     try:
-        result = subprocess.run(
-            ['ffprobe', '-v', 'quiet', '-show_entries', 'format=duration', '-of', 'csv=p=0', str(audio_path)],
-            capture_output=True, text=True, check=True
-        )
-        return float(result.stdout.strip())
-    except (subprocess.CalledProcessError, ValueError):
+        if proc.returncode != 0:
+            return 0.0
+        return float(stdout.decode().strip())
+    except ValueError:
         return 0.0
 
 
-def convert_to_mp3(audio_path: Path) -> Path:
-    """Convert audio to mp3 for reliable API compatibility."""
-    mp3_path = audio_path.with_suffix(".converted.mp3")
-    result = subprocess.run(
-        ['ffmpeg', '-y', '-i', str(audio_path), '-acodec', 'libmp3lame', '-q:a', '2', str(mp3_path)],
-        capture_output=True, text=True
+async def convert_to_mp3(audio_path: Path) -> tuple:
+    """Convert audio to mp3 for reliable API compatibility.
+
+    Streams ffmpeg's output through a pipe — no intermediate .mp3 on disk,
+    so the bytes go straight to the Whisper upload without a write/read/unlink
+    cycle. The source duration is parsed from the same pass (ffmpeg reports
+    it on stderr), so no separate ffprobe decode is needed.
+
+    Returns:
+        (mp3_bytes, duration_seconds); duration is 0.0 if it couldn't be parsed.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        'ffmpeg', '-y', '-i', str(audio_path), '-acodec', 'libmp3lame', '-q:a', '2', '-f', 'mp3', 'pipe:1',
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
     )
-    if result.returncode != 0:
-        raise RuntimeError(f"ffmpeg conversion failed: {result.stderr}")
-    return mp3_path
+    mp3_bytes, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg conversion failed: {stderr.decode(errors='replace')}")
 
+    duration = 0.0
+    match = _DURATION_RE.search(stderr)
+    if match:
+        hours, minutes, seconds = match.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    return mp3_bytes, duration
 
-def transcribe_audio(audio_path: Path, prompt: str = "") -> TranscriptionResult:
+
+async def transcribe_audio(audio_path: Path, prompt: str = "") -> TranscriptionResult:
     """
     Transcribe audio file via OpenAI Whisper API.
 
+    Fully async: ffprobe/ffmpeg run as asyncio subprocesses and the API call
+    goes through AsyncOpenAI, so concurrent transcriptions share the event
+    loop instead of each occupying a worker thread for the whole round-trip.
+
     Args:
         audio_path: Path to audio file
         prompt: Optional context hint for better transcription
@@ -54,36 +85,34 @@ def transcribe_audio(audio_path: Path, prompt: str = "") -> TranscriptionResult:
         TranscriptionResult with success=True and text if successful,
         or success=False with error message if failed.
     """
-    if not OPENAI_API_KEY:
+    if _CLIENT is None:
         return TranscriptionResult(
             success=False,
             error="OPENAI_API_KEY ikke konfigureret"
         )
 
-    mp3_path = None
     try:
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        duration = get_audio_duration(audio_path)
-
-        # Convert to mp3 first for reliable API compatibility
-        mp3_path = convert_to_mp3(audio_path)
+        # Convert to mp3 first for reliable API compatibility; the same
+        # ffmpeg pass reports the duration
+        mp3_bytes, duration = await convert_to_mp3(audio_path)
+        if not duration:
+            duration = await get_audio_duration(audio_path)
 
         # Check file size (Whisper API limit is 25MB)
         max_size_mb = 25
-        file_size_mb = mp3_path.stat().st_size / (1024 * 1024)
+        file_size_mb = len(mp3_bytes) / (1024 * 1024)
         if file_size_mb > max_size_mb:
             return TranscriptionResult(
                 success=False,
                 error=f"Filen er for stor ({file_size_mb:.1f} MB). Max {max_size_mb} MB."
             )
 
-        with open(mp3_path, "rb") as f:
-            result = client.audio.transcriptions.create(
-                model=WHISPER_MODEL,
-                file=f,
-                language=WHISPER_LANGUAGE,
-                prompt=prompt or "Dansk diktat, tale til tekst."
-            )
+        result = await _CLIENT.audio.transcriptions.create(
+            model=WHISPER_MODEL,
+            file=("audio.mp3", mp3_bytes),
+            language=WHISPER_LANGUAGE,
+            prompt=prompt or "Dansk diktat, tale til tekst."
+        )
 
         return TranscriptionResult(
             success=True,
@@ -96,10 +125,6 @@ def transcribe_audio(audio_path: Path, prompt: str = "") -> TranscriptionResult:
             success=False,
             error=f"Whisper API fejl: {str(e)}"
         )
-    finally:
-        # Clean up temp mp3
-        if mp3_path and mp3_path.exists():
-            mp3_path.unlink()
 
 
 def format_duration(seconds: float) -> str:
@@ -1,12 +1,11 @@
 """API usage tracking routes."""
 from typing import List, Optional
 from datetime import datetime
-from collections import defaultdict
 
 from fastapi import APIRouter, Depends
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import text
 
 from ..database import get_db, ApiUsage, User
 from ..auth.deps import get_current_user
@@ -33,8 +32,7 @@ class UsageResponse(BaseModel):
     image_generation_id: Optional[int] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class OperationSummary(BaseModel):
@@ -60,26 +58,9 @@ class UsageSummaryResponse(BaseModel):
     by_month: List[MonthlySummary]
 
 
-def usage_to_response(usage: ApiUsage) -> UsageResponse:
-    """Convert database model to response with DKK conversion."""
-    return UsageResponse(
-        id=usage.id,
-        provider=usage.provider,
-        model=usage.model,
-        operation=usage.operation,
-        api_tier=usage.api_tier,
-        audio_seconds=usage.audio_seconds,
-        input_tokens=usage.input_tokens,
-        output_tokens=usage.output_tokens,
-        images_generated=usage.images_generated,
-        image_resolution=usage.image_resolution,
-        cost_usd=usage.cost_usd,
-        cost_dkk=usd_to_dkk(usage.cost_usd),
-        transcription_id=usage.transcription_id,
-        style_guide_id=usage.style_guide_id,
-        image_generation_id=usage.image_generation_id,
-        created_at=usage.created_at
-    )
+# Validates a whole page in one pydantic-core call instead of constructing
+# each response model field by field in Python
+_USAGE_LIST_ADAPTER = TypeAdapter(List[UsageResponse])
 
 
 @router.get("", response_model=List[UsageResponse])
@@ -90,11 +71,35 @@ def list_usage(
     db: Session = Depends(get_db)
 ):
     """List all API usage for the current user, newest first."""
-    usage_records = db.query(ApiUsage).filter(
+    # cost_dkk comes out of the SELECT, and yield_per streams rows instead of
+    # buffering the whole page before serialization
+    rows = db.query(
+        ApiUsage,
+        (ApiUsage.cost_usd * get_exchange_rate()).label("cost_dkk")
+    ).filter(
         ApiUsage.user_id == user.id
-    ).order_by(ApiUsage.created_at.desc()).offset(skip).limit(limit).all()
-
-    return [usage_to_response(u) for u in usage_records]
+    ).order_by(ApiUsage.created_at.desc()).offset(skip).limit(limit).yield_per(200)
+
+    usage_records = []
+    for u, cost_dkk in rows:
+        u.cost_dkk = cost_dkk
+        usage_records.append(u)
+    return _USAGE_LIST_ADAPTER.validate_python(usage_records, from_attributes=True)
+
+
+# All three summary aggregates in one statement: a single scan-and-dispatch
+# instead of three separate queries. SQLite has no GROUPING SETS, so UNION ALL
+# of the aggregate selects is the equivalent single-round-trip form.
+_SUMMARY_SQL = text("""
+    SELECT 'total' AS kind, NULL AS grp, COUNT(*) AS cnt, COALESCE(SUM(cost_usd), 0) AS cost
+      FROM api_usage WHERE user_id = :user_id
+    UNION ALL
+    SELECT 'op', operation, COUNT(*), SUM(cost_usd)
+      FROM api_usage WHERE user_id = :user_id GROUP BY operation
+    UNION ALL
+    SELECT 'month', strftime('%Y-%m', created_at), COUNT(*), SUM(cost_usd)
+      FROM api_usage WHERE user_id = :user_id GROUP BY 2
+""")
 
 
 @router.get("/summary", response_model=UsageSummaryResponse)
@@ -102,47 +107,41 @@ def get_usage_summary(
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get aggregated usage summary for the current user."""
-    # Get all usage records for this user
-    usage_records = db.query(ApiUsage).filter(
-        ApiUsage.user_id == user.id
-    ).all()
-
-    # Calculate totals
-    total_cost_usd = sum(u.cost_usd for u in usage_records)
-    total_requests = len(usage_records)
-
-    # Group by operation
-    by_operation_dict = defaultdict(lambda: {"count": 0, "cost": 0.0})
-    for u in usage_records:
-        by_operation_dict[u.operation]["count"] += 1
-        by_operation_dict[u.operation]["cost"] += u.cost_usd
+    """Get aggregated usage summary for the current user.
+
+    The group-bys run in SQLite in one statement, so only small aggregate
+    rows cross the wire instead of every usage row.
+    """
+    total_cost_usd = 0.0
+    total_requests = 0
+    operations = []
+    months = []
+    for kind, grp, count, cost in db.execute(_SUMMARY_SQL, {"user_id": user.id}):
+        if kind == "total":
+            total_requests, total_cost_usd = count, cost
+        elif kind == "op":
+            operations.append((grp, count, cost))
+        else:
+            months.append((grp, count, cost))
 
     by_operation = [
         OperationSummary(
-            operation=op,
-            count=data["count"],
-            total_cost_usd=data["cost"],
-            total_cost_dkk=usd_to_dkk(data["cost"])
+            operation=operation,
+            count=count,
+            total_cost_usd=cost,
+            total_cost_dkk=usd_to_dkk(cost)
         )
-        for op, data in sorted(by_operation_dict.items())
+        for operation, count, cost in sorted(operations)
     ]
 
-    # Group by month
-    by_month_dict = defaultdict(lambda: {"count": 0, "cost": 0.0})
-    for u in usage_records:
-        month_key = u.created_at.strftime("%Y-%m")
-        by_month_dict[month_key]["count"] += 1
-        by_month_dict[month_key]["cost"] += u.cost_usd
-
     by_month = [
         MonthlySummary(
             month=month,
-            count=data["count"],
-            total_cost_usd=data["cost"],
-            total_cost_dkk=usd_to_dkk(data["cost"])
+            count=count,
+            total_cost_usd=cost,
+            total_cost_dkk=usd_to_dkk(cost)
         )
-        for month, data in sorted(by_month_dict.items(), reverse=True)
+        for month, count, cost in sorted(months, reverse=True)
     ]
 
     return UsageSummaryResponse(
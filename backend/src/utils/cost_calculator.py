@@ -1,8 +1,20 @@
 """API cost calculation utilities."""
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
 
-# Exchange rate USD to DKK - can be updated as needed
+logger = logging.getLogger(__name__)
+
+# Exchange rate USD to DKK - fallback and starting value; refreshed in the
+# background from a rate API while the app runs
 USD_TO_DKK = 7.0
 
+_current_rate = USD_TO_DKK
+REFRESH_INTERVAL_SECONDS = 6 * 3600
+
 # API pricing (per unit as specified)
 PRICING = {
     "openai": {
@@ -19,9 +31,70 @@ PRICING = {
 }
 
 
+@dataclass(frozen=True, slots=True)
+class ModelPricing:
+    """Precomputed per-unit USD rates for one model."""
+    input_per_token: float = 0.0
+    output_per_token: float = 0.0
+    per_second: float = 0.0
+
+
+# Flat, immutable (provider, model) -> rates lookup built from PRICING once at
+# import: the calculators run in the usage-logging path on every API call, so
+# each call is one hash probe and slotted attribute reads
+_PRICING = MappingProxyType({
+    (provider, model): ModelPricing(
+        input_per_token=rates.get("input_per_million", 0.0) / 1_000_000,
+        output_per_token=rates.get("output_per_million", 0.0) / 1_000_000,
+        per_second=rates.get("per_minute", 0.0) / 60,
+    )
+    for provider, models in PRICING.items()
+    for model, rates in models.items()
+})
+_DEFAULT_WHISPER = _PRICING[("openai", "whisper-1")]
+_DEFAULT_GEMINI = _PRICING[("gemini", "gemini-2.0-flash")]
+
+# Gemini model ids carry versioned suffixes ("gemini-2.0-flash-001") that
+# price the same as the base model; strip them once per distinct id instead
+# of string-parsing on every cost call
+_MODEL_SUFFIX_RE = re.compile(r"-\d{3,}$")
+
+
+@lru_cache(maxsize=128)
+def _lookup_pricing(provider: str, model: str):
+    """Resolve (provider, model) to precomputed rates, ignoring version suffixes."""
+    pricing = _PRICING.get((provider, model))
+    if pricing is None:
+        pricing = _PRICING.get((provider, _MODEL_SUFFIX_RE.sub("", model)))
+    return pricing
+
+
+async def refresh_exchange_rate() -> None:
+    """Fetch the live USD→DKK rate; keeps the previous value on failure."""
+    global _current_rate
+    try:
+        import httpx
+        async with httpx.AsyncClient(timeout=10) as client:
+            resp = await client.get(
+                "https://api.frankfurter.app/latest",
+                params={"from": "USD", "to": "DKK"},
+            )
+            resp.raise_for_status()
+            _current_rate = float(resp.json()["rates"]["DKK"])
+    except Exception as e:
+        logger.warning("Exchange rate refresh failed, keeping %.4f: %s", _current_rate, e)
+
+
+async def refresh_loop() -> None:
+    """Background task: refresh the exchange rate on startup and every 6h."""
+    while True:
+        await refresh_exchange_rate()
+        await asyncio.sleep(REFRESH_INTERVAL_SECONDS)
+
+
 def usd_to_dkk(usd: float) -> float:
     """Convert USD to DKK."""
-    return usd * USD_TO_DKK
+    return usd * _current_rate
 
 
 def calculate_whisper_cost(duration_seconds: float, model: str = "whisper-1") -> float:
@@ -35,10 +108,8 @@ def calculate_whisper_cost(duration_seconds: float, model: str = "whisper-1") ->
     Returns:
         Cost in USD
     """
-    minutes = max(0.0, duration_seconds) / 60
-    openai_pricing = PRICING.get("openai", {})
-    pricing = openai_pricing.get(model, openai_pricing.get("whisper-1", {"per_minute": 0.006}))
-    return minutes * pricing.get("per_minute", 0.006)
+    pricing = _lookup_pricing("openai", model) or _DEFAULT_WHISPER
+    return max(0.0, duration_seconds) * pricing.per_second
 
 
 def calculate_gemini_cost(
@@ -57,14 +128,13 @@ def calculate_gemini_cost(
     Returns:
         Cost in USD
     """
-    gemini_pricing = PRICING.get("gemini", {})
-    default_pricing = {"input_per_million": 0.10, "output_per_million": 0.40}
-    pricing = gemini_pricing.get(model, gemini_pricing.get("gemini-2.0-flash", default_pricing))
-    input_cost = (max(0, input_tokens) / 1_000_000) * pricing.get("input_per_million", 0.10)
-    output_cost = (max(0, output_tokens) / 1_000_000) * pricing.get("output_per_million", 0.40)
-    return input_cost + output_cost
+    pricing = _lookup_pricing("gemini", model) or _DEFAULT_GEMINI
+    return (
+        max(0, input_tokens) * pricing.input_per_token
+        + max(0, output_tokens) * pricing.output_per_token
+    )
 
 
 def get_exchange_rate() -> float:
     """Get current USD to DKK exchange rate."""
-    return USD_TO_DKK
+    return _current_rate
@@ -0,0 +1,65 @@
+"""In-process exact-match cache for Gemini responses, keyed by prompt hash."""
+import hashlib
+import re
+import threading
+from typing import Optional
+
+from cachetools import TTLCache
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Repeated dictations and style re-generations often send the exact same
+# prompt; a hit skips the multi-second Gemini round-trip and its token cost.
+_CACHE: TTLCache = TTLCache(maxsize=500, ttl=7 * 86400)
+_CACHE_LOCK = threading.Lock()
+
+
+def make_key(*parts) -> str:
+    """Build a cache key from everything that shapes the model output.
+
+    Whitespace is normalized first so prompts that differ only in spacing,
+    line breaks or trailing blanks (common with dictated text) share a key.
+    """
+    joined = "|".join(_WHITESPACE.sub(" ", str(p)).strip() for p in parts)
+    return hashlib.sha256(joined.encode()).hexdigest()
+
+
+def cache_get(key: str) -> Optional[str]:
+    """Return the cached response text, or None on miss."""
+    with _CACHE_LOCK:
+        return _CACHE.get(key)
+
+
+def cache_put(key: str, value: str) -> None:
+    """Store a successful response text."""
+    with _CACHE_LOCK:
+        _CACHE[key] = value
+
+
+# Singleflight: when identical requests are already in flight (double-clicked
+# "generate", simultaneous retries), followers wait for the leader instead of
+# firing duplicate paid Gemini calls. Thread-based because the Gemini call
+# sites run in the threadpool.
+_INFLIGHT: dict = {}
+
+
+def acquire_flight(key: str) -> tuple:
+    """Claim an in-flight key. Returns (is_leader, event).
+
+    The leader performs the real call and must call release_flight when done;
+    followers wait on the event and then re-check the cache.
+    """
+    with _CACHE_LOCK:
+        event = _INFLIGHT.get(key)
+        if event is not None:
+            return False, event
+        event = threading.Event()
+        _INFLIGHT[key] = event
+        return True, event
+
+
+def release_flight(key: str, event: threading.Event) -> None:
+    """Wake all followers for a key, whether the call succeeded or not."""
+    with _CACHE_LOCK:
+        _INFLIGHT.pop(key, None)
+    event.set()
@@ -0,0 +1,30 @@
+"""Track recent free-tier outcomes to choose the Gemini tier order.
+
+When the free tier has been failing, trying it first just adds its timeout
+on top of the paid call. A small sliding window of outcomes lets the
+callers flip the order while the free tier is unhealthy, without ever
+calling both tiers for one request.
+"""
+import threading
+from collections import deque
+
+_WINDOW: deque = deque(maxlen=20)
+_LOCK = threading.Lock()
+
+# Only distrust the free tier once we have a few data points
+_MIN_SAMPLES = 4
+
+
+def record_free_result(success: bool) -> None:
+    """Record the outcome of a free-tier call."""
+    with _LOCK:
+        _WINDOW.append(success)
+
+
+def free_tier_healthy() -> bool:
+    """True unless more than half of the recent free-tier calls failed."""
+    with _LOCK:
+        if len(_WINDOW) < _MIN_SAMPLES:
+            return True
+        failures = sum(1 for ok in _WINDOW if not ok)
+        return failures * 2 <= len(_WINDOW)
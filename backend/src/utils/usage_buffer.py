@@ -0,0 +1,62 @@
+"""Buffered ApiUsage logging flushed off the request path.
+
+Usage rows are bookkeeping only — nothing in the request needs them back.
+Buffering them and inserting in batches turns N INSERT+COMMIT round-trips
+into one multi-row INSERT per flush interval.
+"""
+import asyncio
+import logging
+import threading
+
+from sqlalchemy import insert
+
+from ..database import SessionLocal, ApiUsage
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL_SECONDS = 2.0
+
+_BUFFER: list[dict] = []
+_LOCK = threading.Lock()
+
+
+def add_usage(**fields) -> None:
+    """Queue an ApiUsage row for the next flush."""
+    with _LOCK:
+        _BUFFER.append(fields)
+
+
+def flush() -> None:
+    """Insert all buffered rows in a single statement and commit once."""
+    with _LOCK:
+        if not _BUFFER:
+            return
+        rows = _BUFFER[:]
+        _BUFFER.clear()
+
+    db = SessionLocal()
+    try:
+        try:
+            db.execute(insert(ApiUsage), rows)
+            db.commit()
+        except Exception:
+            # One bad row must not cost the rest of the batch — e.g. a row
+            # whose style guide was deleted before the flush fails its FK.
+            # Retry individually and drop only the offenders.
+            db.rollback()
+            for row in rows:
+                try:
+                    db.execute(insert(ApiUsage), [row])
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    logger.exception("Dropping unflushable usage row: %r", row)
+    finally:
+        db.close()
+
+
+async def flush_loop() -> None:
+    """Background task: drain the buffer periodically. Started in lifespan."""
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+        await asyncio.get_running_loop().run_in_executor(None, flush)
@@ -5,7 +5,7 @@ from pathlib import Path
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -16,20 +16,53 @@ from src.main import app
 from src.database import Base, get_db, User
 from src.auth.utils import hash_password
 
+# bcrypt is deliberately slow; the test password never changes, so hash it
+# once for the whole suite instead of per test_user fixture
+_TESTPASS_HASH = hash_password("testpass123")
 
-@pytest.fixture(scope="function")
-def test_db():
-    """Create a fresh test database for each test."""
-    # Use in-memory SQLite for tests
+
+@pytest.fixture(scope="session")
+def _test_engine():
+    """One in-memory engine with the schema created once per session."""
     engine = create_engine(
         "sqlite:///:memory:",
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-    # Create tables
+    # pysqlite's default transaction handling commits implicitly around
+    # SAVEPOINTs, which would leak committed test data past the outer
+    # rollback below. Disable it and emit BEGIN ourselves (the workaround
+    # documented in the SQLAlchemy pysqlite dialect notes).
+    @event.listens_for(engine, "connect")
+    def _do_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _do_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
     Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def test_db(_test_engine):
+    """Fresh database state per test via a rolled-back outer transaction.
+
+    Tables are created once for the whole session; each test runs inside a
+    connection-level transaction that is rolled back in teardown, so
+    session.commit() in app code lands in a SAVEPOINT and never persists.
+    """
+    connection = _test_engine.connect()
+    transaction = connection.begin()
+    TestingSessionLocal = sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=connection,
+        join_transaction_mode="create_savepoint",
+    )
 
     # Override the get_db dependency
     def override_get_db():
@@ -46,13 +79,27 @@ def test_db():
     db.close()
 
     # Clean up
+    transaction.rollback()
+    connection.close()
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(scope="session")
+def _session_client():
+    """One TestClient for the whole suite.
+
+    Built without the context manager so the app lifespan (which would run
+    init_db against the real database file and start background tasks) never
+    fires in tests.
+    """
+    return TestClient(app)
+
+
 @pytest.fixture
-def client(test_db):
+def client(_session_client, test_db):
     """Test client with fresh database."""
-    return TestClient(app)
+    _session_client.cookies.clear()
+    return _session_client
 
 
 @pytest.fixture
@@ -60,12 +107,11 @@ def test_user(test_db):
     """Create a test user."""
     user = User(
         username="testuser",
-        password_hash=hash_password("testpass123"),
+        password_hash=_TESTPASS_HASH,
         email="test@example.com"
     )
     test_db.add(user)
     test_db.commit()
-    test_db.refresh(user)
     return user
 
 
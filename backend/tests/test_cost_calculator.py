@@ -12,46 +12,28 @@ from src.utils.cost_calculator import (
 class TestWhisperCost:
     """Tests for Whisper cost calculation."""
 
-    def test_one_minute_audio(self):
-        """1 minute should cost $0.006."""
-        cost = calculate_whisper_cost(60)  # 60 seconds
-        assert cost == pytest.approx(0.006)
-
-    def test_ten_minutes_audio(self):
-        """10 minutes should cost $0.06."""
-        cost = calculate_whisper_cost(600)  # 600 seconds
-        assert cost == pytest.approx(0.06)
-
-    def test_zero_duration(self):
-        """0 seconds should cost $0."""
-        cost = calculate_whisper_cost(0)
-        assert cost == 0.0
-
-    def test_fractional_minutes(self):
-        """30 seconds = 0.5 minutes = $0.003."""
-        cost = calculate_whisper_cost(30)
-        assert cost == pytest.approx(0.003)
+    @pytest.mark.parametrize("seconds,expected", [
+        (60, 0.006),    # 1 minute
+        (600, 0.06),    # 10 minutes
+        (0, 0.0),       # empty audio
+        (30, 0.003),    # fractional minute
+    ])
+    def test_cost(self, seconds, expected):
+        """Cost is $0.006 per minute, pro-rated by the second."""
+        assert calculate_whisper_cost(seconds) == pytest.approx(expected)
 
 
 class TestGeminiCost:
     """Tests for Gemini text cost calculation."""
 
-    def test_one_million_tokens(self):
-        """1M input + 1M output tokens."""
-        cost = calculate_gemini_cost(1_000_000, 1_000_000)
-        expected = 0.10 + 0.40  # $0.10 input + $0.40 output per million
-        assert cost == pytest.approx(expected)
-
-    def test_zero_tokens(self):
-        """0 tokens should cost $0."""
-        cost = calculate_gemini_cost(0, 0)
-        assert cost == 0.0
-
-    def test_typical_request(self):
-        """Typical request: 1000 input, 500 output tokens."""
-        cost = calculate_gemini_cost(1000, 500)
-        expected = (1000 / 1_000_000) * 0.10 + (500 / 1_000_000) * 0.40
-        assert cost == pytest.approx(expected)
+    @pytest.mark.parametrize("input_tokens,output_tokens,expected", [
+        (1_000_000, 1_000_000, 0.10 + 0.40),  # $0.10 input + $0.40 output per million
+        (0, 0, 0.0),
+        (1000, 500, (1000 / 1_000_000) * 0.10 + (500 / 1_000_000) * 0.40),  # typical request
+    ])
+    def test_cost(self, input_tokens, output_tokens, expected):
+        """Cost is per-million-token input and output rates summed."""
+        assert calculate_gemini_cost(input_tokens, output_tokens) == pytest.approx(expected)
 
 
 class TestCurrencyConversion:
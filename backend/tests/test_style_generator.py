@@ -0,0 +1,35 @@
+"""Tests for style guide example truncation."""
+from src.settings.style_generator import _truncate_examples, MAX_EXAMPLE_CHARS
+
+
+class TestTruncateExamples:
+    """Tests for trimming oversized examples before the Gemini prompt."""
+
+    def test_under_budget_unchanged(self):
+        """Text within the budget passes through untouched."""
+        assert _truncate_examples("kort tekst") == "kort tekst"
+
+    def test_single_oversized_paragraph_hard_slices(self):
+        """One huge paragraph with no blank lines must not truncate to nothing."""
+        text = "x" * (MAX_EXAMPLE_CHARS + 8_000)
+        result = _truncate_examples(text)
+        assert result == text[:MAX_EXAMPLE_CHARS]
+
+    def test_oversized_paragraph_is_skipped(self):
+        """A paragraph over budget is skipped, not treated as end-of-input."""
+        big = "x" * (MAX_EXAMPLE_CHARS + 1_000)
+        small = "y" * 100
+        result = _truncate_examples(big + "\n\n" + small)
+        assert small in result
+        assert len(result) <= MAX_EXAMPLE_CHARS
+
+    def test_keeps_whole_paragraphs_within_budget(self):
+        """Normal truncation returns intact paragraphs from both ends."""
+        paragraphs = [f"afsnit {i} " + "x" * 1_000 for i in range(50)]
+        result = _truncate_examples("\n\n".join(paragraphs))
+        assert len(result) <= MAX_EXAMPLE_CHARS
+        kept = result.split("\n\n")
+        assert kept[0] == paragraphs[0]
+        assert kept[-1] == paragraphs[-1]
+        for para in kept:
+            assert para in paragraphs
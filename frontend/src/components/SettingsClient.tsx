@@ -2,6 +2,7 @@ import { useState, useEffect } from 'react';
 import {
   getMe,
   getStyleGuides,
+  getStyleGuide,
   createStyleGuide,
   deleteStyleGuide,
   type StyleGuide,
@@ -68,8 +69,18 @@ export default function SettingsClient({ basePath }: Props) {
     }
   };
 
+  const handleEdit = async (guide: StyleGuide) => {
+    try {
+      // List items don't include examples/guide_content; fetch the full guide
+      setEditingGuide(await getStyleGuide(guide.id));
+    } catch (err) {
+      setError(err instanceof Error ? err.message : 'Kunne ikke indlæse stilguide');
+    }
+  };
+
   const handleGuideUpdated = (updated: StyleGuide) => {
-    setStyleGuides(styleGuides.map(g => g.id === updated.id ? updated : g));
+    const listItem = { ...updated, has_content: !!updated.guide_content };
+    setStyleGuides(styleGuides.map(g => g.id === updated.id ? listItem : g));
     setEditingGuide(updated);
   };
 
@@ -203,7 +214,7 @@ export default function SettingsClient({ basePath }: Props) {
                       ? 'border-blue-300 bg-blue-50'
                       : 'border-gray-200 hover:bg-gray-50'
                   }`}
-                  onClick={() => setEditingGuide(guide)}
+                  onClick={() => handleEdit(guide)}
                 >
                   <div className="flex items-center gap-2">
                     <span className="font-medium text-gray-900">{guide.name}</span>
@@ -212,7 +223,7 @@ export default function SettingsClient({ basePath }: Props) {
                         Standard
                       </span>
                     )}
-                    {!guide.guide_content && (
+                    {!guide.has_content && (
                       <span className="text-xs bg-yellow-100 text-yellow-700 px-2 py-0.5 rounded">
                         Ikke genereret
                       </span>
@@ -46,7 +46,7 @@ export default function TranscriptionView({ transcription, onUpdate, onBack }: P
         const guides = await getStyleGuides();
         setStyleGuides(guides);
         // Select default guide if exists
-        const defaultGuide = guides.find(g => g.is_default && g.guide_content);
+        const defaultGuide = guides.find(g => g.is_default && g.has_content);
         if (defaultGuide) {
           setSelectedStyleGuideId(defaultGuide.id);
         }
@@ -278,7 +278,7 @@ export default function TranscriptionView({ transcription, onUpdate, onBack }: P
               className="input"
             >
               <option value="">Ingen stilguide</option>
-              {styleGuides.filter(g => g.guide_content).map(guide => (
+              {styleGuides.filter(g => g.has_content).map(guide => (
                 <option key={guide.id} value={guide.id}>
                   {guide.name}{guide.is_default ? ' (Standard)' : ''}
                 </option>
@@ -175,6 +175,7 @@ export interface StyleGuide {
   description?: string;
   examples?: string;
   guide_content?: string;
+  has_content?: boolean;  // Set on list items; full text fields are omitted there
   is_default: boolean;
   created_at: string;
   updated_at: string;